@@ -1,4 +1,5 @@
 from struct import Struct
+from typing import FrozenSet, Tuple, Union
 
 #: Represents a return value that should be skipped and process the next step instead.
 SKIP = object()
@@ -45,12 +46,25 @@ MAP16 = 0xDE
 MAP32 = 0xDF
 NEGATIVE_FIXINT = (0xE0, 0xFF)
 
-# MessagePack format groups
-UINT = (POSITIVE_FIXINT, UINT8, UINT16, UINT32, UINT64)
-INT = (*UINT, NEGATIVE_FIXINT, INT8, INT16, INT32, INT64)
-STR = (FIXSTR, STR8, STR16, STR32)
-ARRAY = (FIXARRAY, ARRAY16, ARRAY32)
-MAP = (FIXMAP, MAP16, MAP32)
+
+def code_set(*codes: Union[int, Tuple[int, int]]) -> FrozenSet[int]:
+    """
+    Build the set of the given codes, to restrict a step to (see :meth:`msgpackr.unpack.Unpacker.step`).
+
+    :param codes: The codes to allow, either single codes or (low, high) inclusive ranges.
+
+    :return: The set of the allowed codes.
+    """
+
+    return frozenset(c for code in codes for c in (range(code[0], code[1] + 1) if isinstance(code, tuple) else (code,)))
+
+
+# MessagePack format groups, as code sets (see code_set)
+UINT = code_set(POSITIVE_FIXINT, UINT8, UINT16, UINT32, UINT64)
+INT = code_set(POSITIVE_FIXINT, UINT8, UINT16, UINT32, UINT64, NEGATIVE_FIXINT, INT8, INT16, INT32, INT64)
+STR = code_set(FIXSTR, STR8, STR16, STR32)
+ARRAY = code_set(FIXARRAY, ARRAY16, ARRAY32)
+MAP = code_set(FIXMAP, MAP16, MAP32)
 
 # Structs
 UINT8_STRUCT = Struct("B")
@@ -63,3 +77,22 @@ INT32_STRUCT = Struct(">i")
 INT64_STRUCT = Struct(">q")
 FLOAT32_STRUCT = Struct(">f")
 FLOAT64_STRUCT = Struct(">d")
+# ext headers: size, then signed type
+EXT8_HEADER_STRUCT = Struct(">Bb")
+EXT16_HEADER_STRUCT = Struct(">Hb")
+EXT32_HEADER_STRUCT = Struct(">Ib")
+
+# Bound Struct readers, saving the method lookup on every read
+UINT8_UNPACK = UINT8_STRUCT.unpack_from
+UINT16_UNPACK = UINT16_STRUCT.unpack_from
+UINT32_UNPACK = UINT32_STRUCT.unpack_from
+UINT64_UNPACK = UINT64_STRUCT.unpack_from
+INT8_UNPACK = INT8_STRUCT.unpack_from
+INT16_UNPACK = INT16_STRUCT.unpack_from
+INT32_UNPACK = INT32_STRUCT.unpack_from
+INT64_UNPACK = INT64_STRUCT.unpack_from
+FLOAT32_UNPACK = FLOAT32_STRUCT.unpack_from
+FLOAT64_UNPACK = FLOAT64_STRUCT.unpack_from
+EXT8_HEADER_UNPACK = EXT8_HEADER_STRUCT.unpack_from
+EXT16_HEADER_UNPACK = EXT16_HEADER_STRUCT.unpack_from
+EXT32_HEADER_UNPACK = EXT32_HEADER_STRUCT.unpack_from
@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, List, Tuple, Union
+from typing import Any, Callable, Dict, Tuple, Union
 
-from msgpackr.constants import ARRAY, SKIP, STR, UINT32_STRUCT, UNDEFINED
+from msgpackr.constants import ARRAY, SKIP, STR, UINT32_UNPACK, UINT64_UNPACK, UNDEFINED
 
 BytesLike = Union[bytes, bytearray, memoryview]
 
@@ -44,16 +44,16 @@ class TimestampExtension(MsgpackExtension):
     @classmethod
     def unpack(cls, _unpacker, data: BytesLike, pos: int, length: int) -> datetime:
         if length == 4:
-            return datetime.fromtimestamp(int.from_bytes(data[pos : pos + length], "big"))
+            return datetime.fromtimestamp(UINT32_UNPACK(data, pos)[0])
 
         if length == 8:
-            e = int.from_bytes(data[pos : pos + length], "big")
+            e = UINT64_UNPACK(data, pos)[0]
             d = datetime.fromtimestamp(e & 0x3FFFFFFFF)
 
             return d.replace(microsecond=(e >> 34) // 1000)
 
         if length == 12:
-            e = int.from_bytes(data[pos : pos + length], "big")
+            e = int.from_bytes(memoryview(data)[pos : pos + length], "big")
             d = datetime.fromtimestamp(e & 0xFFFFFFFFFFFFFFFF)
 
             return d.replace(microsecond=(e >> 64) * 1000)
@@ -111,7 +111,7 @@ class BigIntExtension(MsgpackExtension):
 
     @classmethod
     def unpack(cls, _unpacker, data: BytesLike, pos: int, length: int) -> int:
-        return int.from_bytes(data[pos : pos + length], "big")
+        return int.from_bytes(memoryview(data)[pos : pos + length], "big")
 
     @classmethod
     def pack(cls, _unpacker, data: int) -> bytes:
@@ -124,16 +124,18 @@ class BundledStrings:
     begin: int
     end: int
 
-    positions: List[int]
+    pos_left: int
+    pos_right: int
 
     def __init__(self, offset: [int, None]):
         self.string_offset = offset
         self.strings = ("", "")
-        self.positions = [0, 0]
+        self.pos_left = 0
+        self.pos_right = 0
 
     def __repr__(self):
-        left = f"{self.positions[0]}/{len(self.strings[0])}"
-        right = f"{self.positions[1]}/{len(self.strings[1])}"
+        left = f"{self.pos_left}/{len(self.strings[0])}"
+        right = f"{self.pos_right}/{len(self.strings[1])}"
 
         return f"{self.__class__.__name__}(left={left}, right={right}, begin={hex(self.begin)}, end={hex(self.end)})"
 
@@ -163,11 +165,14 @@ class BundledStrings:
         if self.string_offset is not None:
             raise ValueError("Bundled strings not populated")
 
-        sign = 0 <= length  # 0 for left, 1 for right
-        string = self.strings[sign]
-
-        start = self.positions[sign]
-        end = start + abs(length)
+        if length >= 0:
+            string = self.strings[1]
+            start = self.pos_right
+            end = start + length
+        else:
+            string = self.strings[0]
+            start = self.pos_left
+            end = start - length
 
         if len(string) == start:
             raise ValueError("BundledStrings exhausted")
@@ -176,14 +181,18 @@ class BundledStrings:
             raise ValueError(f"String out of bounds: {len(string)} < {end}")
 
         if not peek:
-            self.positions[sign] = end
+            if length >= 0:
+                self.pos_right = end
+            else:
+                self.pos_left = end
 
         return string[start:end]
 
     def copy(self):
         obj = BundledStrings(self.string_offset)
         obj.strings = self.strings
-        obj.positions = self.positions.copy()
+        obj.pos_left = self.pos_left
+        obj.pos_right = self.pos_right
 
         return obj
 
@@ -193,7 +202,7 @@ class BundledStringsExtension(MsgpackExtensionWithPost):
 
     @classmethod
     def unpack(cls, unpacker, data: BytesLike, pos: int, length: int) -> BundledStrings:
-        offset = UINT32_STRUCT.unpack_from(data, pos)[0] - length
+        offset = UINT32_UNPACK(data, pos)[0] - length
 
         return BundledStrings(offset)
 
@@ -263,6 +272,62 @@ class ErrorExtension(MsgpackExtensionWithPost):
 #     EXT_TYPE = 106
 
 
+#: Generated record decoders, by record keys.
+_RECORD_DECODERS: Dict[Tuple[str, ...], Callable[[Callable, BytesLike, int], Tuple[int, dict]]] = {}
+#: Maximum number of keys of a record to generate a decoder for, larger records are decoded with a loop.
+_RECORD_DECODER_MAX_KEYS = 64
+#: Maximum total number of keys of the generated record decoders, past which records are decoded with a loop.
+_RECORD_DECODERS_KEYS = 16384
+#: Total number of keys of the generated record decoders.
+_record_decoders_keys = 0
+
+
+def _record_decoder(keys: Tuple[str, ...]) -> Callable[[Callable, BytesLike, int], Tuple[int, dict]]:
+    """
+    Generate a function decoding the values of a record with the given keys, unrolling the loop over the keys.
+    The function is called as `decode(unpacker.step, data, pos)` and returns the new position and the record.
+
+    :param keys: The keys of the record.
+
+    :return: The generated function.
+    """
+
+    lines = ["def decode(step, data, pos):"]
+    lines += [f"    pos, v{i} = step(data, pos)" for i in range(len(keys))]
+    items = ", ".join(f"{key!r}: v{i}" for i, key in enumerate(keys))
+    lines.append(f"    return pos, {{{items}}}")
+
+    namespace = {}
+    exec("\n".join(lines), namespace)  # nosec B102 - keys are only inserted as str literals (repr)
+
+    return namespace["decode"]
+
+
+def _cached_record_decoder(
+    keys: Tuple[str, ...]
+) -> Union[Callable[[Callable, BytesLike, int], Tuple[int, dict]], None]:
+    """
+    Get the generated decoder of a record, generating it if the record is small enough and the cache has room.
+
+    :param keys: The keys of the record.
+
+    :return: The decoder, or None if the record should be decoded with a loop.
+    """
+
+    global _record_decoders_keys
+
+    decoder = _RECORD_DECODERS.get(keys)
+    if (
+        decoder is None
+        and len(keys) <= _RECORD_DECODER_MAX_KEYS
+        and _record_decoders_keys + len(keys) <= _RECORD_DECODERS_KEYS
+    ):
+        decoder = _RECORD_DECODERS[keys] = _record_decoder(keys)
+        _record_decoders_keys += len(keys)
+
+    return decoder
+
+
 class RecordExtension(MsgpackExtensionWithPost):
     EXT_TYPE = 114
 
@@ -272,42 +337,43 @@ class RecordExtension(MsgpackExtensionWithPost):
         if not 0x40 <= identifier1 <= 0x7F:
             raise ValueError(f"Invalid record identifier: {identifier1}")
 
-        identifier1 &= 0x3F
+        if length != 1 and length != 2:
+            raise ValueError(f"Invalid record identifier length: {length} bytes")
 
-        if length == 1:
-            return identifier1
-
-        if length == 2:
-            identifier2 = data[pos + 1]
-            # TODO: do we need to check the range?
-
-            return identifier2 << 5 + identifier1
-
-        raise ValueError(f"Invalid record identifier length: {length} bytes")
+        # TODO: do we need to check the range of the second identifier?
+        return ((data[pos + 1] << 5) + (identifier1 & 0x3F)) if length == 2 else identifier1 & 0x3F
 
     @classmethod
     def post_unpack(cls, unpacker, data: BytesLike, pos: int, ret: int) -> Tuple[int, Any]:
-        assert isinstance(ret, int)
-
+        # ret is the identifier from unpack or Unpacker.record, not checked as this runs for every record
         records = unpacker.records
         if records is None:
             raise ValueError("Records extension is disabled")
 
         if ret in records:
             keys = records[ret]
+            if type(keys) is not tuple:
+                keys = tuple(keys)
+
+            # only reused records are worth generating a decoder for
+            decoder = _cached_record_decoder(keys)
         else:
             pos, keys = unpacker.step(data, pos, restrict=ARRAY)
             if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
                 raise ValueError(f"Invalid record keys: {keys!r}")
 
-            records[ret] = keys
+            # stored as a tuple, which is also the key of its decoder
+            records[ret] = keys = tuple(keys)
+            decoder = _RECORD_DECODERS.get(keys)
+
+        if decoder is not None:
+            return decoder(unpacker.step, data, pos)
 
-        record = {}
-        for key in keys:
-            pos, value = unpacker.step(data, pos)
-            record[key] = value
+        values = [None] * len(keys)
+        for i in range(len(keys)):
+            pos, values[i] = unpacker.step(data, pos)
 
-        return pos, record
+        return pos, dict(zip(keys, values))
 
     @classmethod
     def pack(cls, unpacker, data: dict) -> bytes:
@@ -5,8 +5,10 @@ Thanks to JasonLWalker for helping to spot the non-standard additions to the Mes
 """
 
 
-from functools import partial
-from typing import Any, Callable, Dict, List, Tuple, Type, Union
+from array import array
+from struct import Struct
+from sys import intern
+from typing import Any, Callable, Dict, FrozenSet, List, Sequence, Tuple, Type, Union
 
 from msgpackr.constants import *
 from msgpackr.extension import (
@@ -23,21 +25,211 @@ from msgpackr.extension import (
 BytesLike = Union[bytes, bytearray, memoryview]
 
 
+#: Struct format character (also the array typecode) and payload width of the fixed-width codes,
+#: for batch decoding of homogeneous arrays.
+_BATCH_FORMATS: Dict[int, Tuple[str, int]] = {
+    FLOAT32: ("f", 4),
+    FLOAT64: ("d", 8),
+    UINT8: ("B", 1),
+    UINT16: ("H", 2),
+    UINT32: ("I", 4),
+    UINT64: ("Q", 8),
+    INT8: ("b", 1),
+    INT16: ("h", 2),
+    INT32: ("i", 4),
+    INT64: ("q", 8),
+}
+#: Number of items decoded by each Struct call of the batch decoding.
+_BATCH_BLOCK_SIZE = 64
+#: Compiled Structs of the batch decoding, by format character and number of items (at most _BATCH_BLOCK_SIZE).
+_BATCH_STRUCTS: Dict[Tuple[str, int], Struct] = {}
+#: Positive and negative fixint codes, with and without the codes taken by records.
+_FIXINTS = bytes(range(POSITIVE_FIXINT[0], RECORD[1] + 1)) + bytes(range(NEGATIVE_FIXINT[0], NEGATIVE_FIXINT[1] + 1))
+_FIXINTS_NO_RECORD = bytes(range(POSITIVE_FIXINT[0], POSITIVE_FIXINT[1] + 1)) + bytes(
+    range(NEGATIVE_FIXINT[0], NEGATIVE_FIXINT[1] + 1)
+)
+#: How the container loop handles each code byte: call its handler, use a constant value, decode a fixstr inline,
+#: or read a nested array or map in the same loop.
+_KIND_HANDLER, _KIND_CONSTANT, _KIND_FIXSTR, _KIND_ARRAY, _KIND_MAP = range(5)
+_KINDS = bytearray(256)
+#: Values of the codes of kind _KIND_CONSTANT.
+_CONSTANTS: List[Any] = [None] * 256
+for _code in range(POSITIVE_FIXINT[0], POSITIVE_FIXINT[1] + 1):
+    _KINDS[_code] = _KIND_CONSTANT
+    _CONSTANTS[_code] = _code
+for _code in range(NEGATIVE_FIXINT[0], NEGATIVE_FIXINT[1] + 1):
+    _KINDS[_code] = _KIND_CONSTANT
+    _CONSTANTS[_code] = _code - 0x100
+for _code, _value in ((NIL, None), (FALSE, False), (TRUE, True)):
+    _KINDS[_code] = _KIND_CONSTANT
+    _CONSTANTS[_code] = _value
+for _code in range(FIXSTR[0], FIXSTR[1] + 1):
+    _KINDS[_code] = _KIND_FIXSTR
+for _code in (*range(FIXARRAY[0], FIXARRAY[1] + 1), ARRAY16, ARRAY32):
+    _KINDS[_code] = _KIND_ARRAY
+for _code in (*range(FIXMAP[0], FIXMAP[1] + 1), MAP16, MAP32):
+    _KINDS[_code] = _KIND_MAP
+_KINDS = bytes(_KINDS)
+del _code, _value
+#: Maximum number of entries of the map key cache.
+_KEY_CACHE_SIZE = 4096
+#: Maximum length of the string keys cached and interned when they are not fixstr.
+_INTERN_KEY_SIZE = 32
+#: Maximum size of the buffers copied to bytes before unpacking.
+_COPY_MAX_SIZE = 4 * 1024 * 1024
+#: Minimum size of an array to attempt batch decoding.
+_BATCH_MIN_SIZE = 4
+
+
+def _batch_struct(char: str, count: int) -> Struct:
+    """
+    Get the Struct reading count items of the given format character, each preceded by its code as a pad byte.
+    """
+
+    st = _BATCH_STRUCTS.get((char, count))
+    if st is None:
+        st = _BATCH_STRUCTS[(char, count)] = Struct(">" + ("x" + char) * count)
+
+    return st
+
+
+def _format_codes(codes: FrozenSet[int]) -> str:
+    """
+    Format a set of codes, grouping contiguous codes into ranges.
+    """
+
+    ranges = []
+    for c in sorted(codes):
+        if ranges and ranges[-1][1] == c - 1:
+            ranges[-1][1] = c
+        else:
+            ranges.append([c, c])
+
+    return ", ".join(f"{low:02x}-{high:02x}" if low != high else f"{low:02x}" for low, high in ranges)
+
+
+def _bind_range_code(func: Callable[["Unpacker", int, BytesLike, int], Tuple[int, Any]], code: int):
+    """
+    Wrap a range code handler into a fixed code handler, for the given code.
+    """
+
+    return lambda self, data, pos: func(self, code, data, pos)
+
+
+def _invalid_code(_self, data: BytesLike, pos: int):
+    raise ValueError(f"Invalid code: 0x{data[pos - 1]:02x} at position {hex(pos)}")
+
+
+def _make_bin(unpack_size: Callable[[BytesLike, int], Tuple[int]], offset: int):
+    """
+    Make the handler of a bin code, whose payload size is read with unpack_size and takes offset bytes.
+    """
+
+    def bin_handler(self: "Unpacker", data: BytesLike, pos: int) -> Tuple[int, Union[bytes, memoryview]]:
+        begin = pos + offset
+        if begin > len(data):
+            self.check_data_length(begin, data)
+        end = begin + unpack_size(data, pos)[0]  # pos + offset + size
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        if self.zero_copy_bin:
+            return end, (data if isinstance(data, memoryview) else memoryview(data))[begin:end]
+
+        return end, bytes(data[begin:end])
+
+    return bin_handler
+
+
+def _make_ext(unpack_header: Callable[[BytesLike, int], Tuple[int, int]], offset: int):
+    """
+    Make the handler of an ext code, whose size and type are read with unpack_header and take offset bytes.
+    """
+
+    def ext_handler(self: "Unpacker", data: BytesLike, pos: int) -> Tuple[int, Any]:
+        begin = pos + offset
+        if begin > len(data):
+            self.check_data_length(begin, data)
+        size, ext_type = unpack_header(data, pos)
+
+        handlers = self._ext_handlers.get(ext_type)
+        if handlers is None:
+            raise ValueError(f"Unknown extension type: {ext_type}")
+
+        end = begin + size  # pos + header + size
+        unpack, post_unpack = handlers
+        ret = unpack(self, data, begin, size)
+        if post_unpack is not None:
+            end, ret = post_unpack(self, data, end, ret)
+
+        return end, ret
+
+    return ext_handler
+
+
+def _make_fixext(size: int):
+    """
+    Make the handler of a fixext code, whose payload takes size bytes.
+    """
+
+    def fixext_handler(self: "Unpacker", data: BytesLike, pos: int) -> Tuple[int, Any]:
+        begin = pos + 1
+        end = begin + size
+        if end > len(data):
+            self.check_data_length(end, data)
+        ext_type = data[pos]
+        if ext_type & 0x80:
+            ext_type -= 0x100
+        handlers = self._ext_handlers.get(ext_type)
+        if handlers is None:
+            raise ValueError(f"Unknown extension type: {ext_type}")
+
+        unpack, post_unpack = handlers
+        ret = unpack(self, data, begin, size)
+        if post_unpack is not None:
+            end, ret = post_unpack(self, data, end, ret)
+
+        return end, ret
+
+    return fixext_handler
+
+
 # noinspection PyMethodMayBeStatic
 class Unpacker:
     #: The registered extensions.
     extensions: Dict[int, Type[MsgpackExtension]]
+    #: The unpack and post_unpack (None if absent) methods of the registered extensions.
+    _ext_handlers: Dict[int, Tuple[Callable[..., Any], Union[Callable[..., Tuple[int, Any]], None]]]
     #: Whether to enable bundled strings.
     use_bundled_strings: bool
+    #: Whether to return bin payloads as views into the data instead of copies.
+    zero_copy_bin: bool
+    #: Whether to return homogeneous arrays of fixints or fixed-width numbers as array.array instead of list.
+    typed_arrays: bool
 
     #: Last bundle used for bundled strings. It needs to be stored there, as the bundle can be initialized anywhere.
     bundle: Union[BundledStrings, None]
     #: List of previously unpacked records's keys.
-    records: Dict[int, List[str]]
+    records: Dict[int, Tuple[str, ...]]
+
+    #: Fixed-width codes that homogeneous arrays can be batch-decoded for.
+    _batch_formats: Dict[int, Tuple[str, int]]
+    #: Whether arrays of fixints can be batch-decoded.
+    _batch_fixints: bool
+    #: Decoded fixstr map keys, by raw bytes. None if fixstr is replaced.
+    _key_cache: Union[Dict[bytes, str], None]
+    #: Other short map keys (e.g. str8 or bundled), by value. Shares the size limit with _key_cache.
+    _str_key_cache: Dict[str, str]
+    #: How the container loop handles each code byte (see _KINDS).
+    _kinds: Union[bytes, bytearray]
+    #: Handlers indexed by code byte, built from CODES_FIXED and CODES_RANGES.
+    #: The tuple of the class until a code is replaced, then a list of this instance.
+    _dispatch: Union[Tuple[Callable[["Unpacker", BytesLike, int], Tuple[int, Any]], ...], List[Callable[..., Any]]]
 
     def check_data_length(self, length: int, data: BytesLike):
         """
         Check that the data is at least the given length.
+        The handlers compare the length inline and only call this once the data is too short.
 
         :param length: The minimum length.
         :param data: The data.
@@ -58,127 +250,408 @@ class Unpacker:
 
         return pos, ret
 
-    def bin(self, data: BytesLike, pos: int, st: Struct, offset: int) -> Tuple[int, BytesLike]:
-        begin = pos + offset
-        self.check_data_length(begin, data)
-        end = begin + st.unpack_from(data, pos)[0]  # pos + offset + size
+    bin8 = _make_bin(UINT8_UNPACK, 1)
+    bin16 = _make_bin(UINT16_UNPACK, 2)
+    bin32 = _make_bin(UINT32_UNPACK, 4)
 
-        return end, data[begin:end]
+    ext8 = _make_ext(EXT8_HEADER_UNPACK, 2)
+    ext16 = _make_ext(EXT16_HEADER_UNPACK, 3)
+    ext32 = _make_ext(EXT32_HEADER_UNPACK, 5)
 
-    def ext(self, data: BytesLike, pos: int, st: Struct, offset: int) -> Tuple[int, Any]:
-        begin = pos + offset
-        self.check_data_length(begin, data)
-        size = st.unpack_from(data, pos)[0]
+    def float32(self, data: BytesLike, pos: int) -> Tuple[int, float]:
+        end = pos + 4
+        if end > len(data):
+            self.check_data_length(end, data)
 
-        ext_type = INT8_STRUCT.unpack_from(data, begin)[0]
-        if ext_type not in self.extensions:
-            raise ValueError(f"Unknown extension type: {ext_type}")
+        return end, FLOAT32_UNPACK(data, pos)[0]
 
-        end = begin + size + 1  # pos + offset + size + ext_type
-        extension = self.extensions[ext_type]
-        ret = extension.unpack(self, data, begin + 1, size)
-        if issubclass(extension, MsgpackExtensionWithPost):
-            end, ret = extension.post_unpack(self, data, end, ret)
+    def float64(self, data: BytesLike, pos: int) -> Tuple[int, float]:
+        end = pos + 8
+        if end > len(data):
+            self.check_data_length(end, data)
 
-        return end, ret
+        return end, FLOAT64_UNPACK(data, pos)[0]
 
-    def float(self, data: BytesLike, pos: int, st: Struct, size: int) -> Tuple[int, float]:
-        end = pos + size
-        self.check_data_length(end, data)
+    def uint8(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 1
+        if end > len(data):
+            self.check_data_length(end, data)
 
-        return end, st.unpack_from(data, pos)[0]
+        return end, data[pos]
 
-    def int(self, data: BytesLike, pos: int, st: Struct, size: int) -> Tuple[int, int]:
-        end = pos + size
-        self.check_data_length(end, data)
+    def uint16(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 2
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return end, UINT16_UNPACK(data, pos)[0]
+
+    def uint32(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 4
+        if end > len(data):
+            self.check_data_length(end, data)
 
-        return end, st.unpack_from(data, pos)[0]
+        return end, UINT32_UNPACK(data, pos)[0]
 
-    def fixext(self, data: BytesLike, pos: int, size: int) -> Tuple[int, Any]:
+    def uint64(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 8
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return end, UINT64_UNPACK(data, pos)[0]
+
+    def int8(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 1
+        if end > len(data):
+            self.check_data_length(end, data)
+        value = data[pos]
+
+        return end, value - 0x100 if value & 0x80 else value
+
+    def int16(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 2
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return end, INT16_UNPACK(data, pos)[0]
+
+    def int32(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 4
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return end, INT32_UNPACK(data, pos)[0]
+
+    def int64(self, data: BytesLike, pos: int) -> Tuple[int, int]:
+        end = pos + 8
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return end, INT64_UNPACK(data, pos)[0]
+
+    fixext1 = _make_fixext(1)
+    fixext2 = _make_fixext(2)
+    fixext4 = _make_fixext(4)
+    fixext8 = _make_fixext(8)
+    fixext16 = _make_fixext(16)
+
+    def str8(self, data: BytesLike, pos: int) -> Tuple[int, str]:
         begin = pos + 1
-        end = begin + size
-        self.check_data_length(end, data)
-        ext_type = INT8_STRUCT.unpack_from(data, pos)[0]
-        if ext_type not in self.extensions:
-            raise ValueError(f"Unknown extension type: {ext_type}")
+        if begin > len(data):
+            self.check_data_length(begin, data)
+        end = begin + data[pos]
 
-        extension = self.extensions[ext_type]
-        ret = extension.unpack(self, data, begin, size)
-        if issubclass(extension, MsgpackExtensionWithPost):
-            end, ret = extension.post_unpack(self, data, end, ret)
+        if end > len(data):
+            self.check_data_length(end, data)
+        if isinstance(data, memoryview):
+            return end, data[begin:end].tobytes().decode()
 
-        return end, ret
+        return end, data[begin:end].decode()
 
-    def str(self, data: BytesLike, pos: int, st: Struct, offset: int) -> Tuple[int, str]:
-        self.check_data_length(pos + offset, data)
-        size = st.unpack_from(data, pos)[0]
-        pos += offset
-        end = pos + size
+    def str16(self, data: BytesLike, pos: int) -> Tuple[int, str]:
+        begin = pos + 2
+        if begin > len(data):
+            self.check_data_length(begin, data)
+        end = begin + UINT16_UNPACK(data, pos)[0]
 
-        self.check_data_length(end, data)
+        if end > len(data):
+            self.check_data_length(end, data)
         if isinstance(data, memoryview):
-            return end, data[pos:end].tobytes().decode()
+            return end, data[begin:end].tobytes().decode()
+
+        return end, data[begin:end].decode()
+
+    def str32(self, data: BytesLike, pos: int) -> Tuple[int, str]:
+        begin = pos + 4
+        if begin > len(data):
+            self.check_data_length(begin, data)
+        end = begin + UINT32_UNPACK(data, pos)[0]
+
+        if end > len(data):
+            self.check_data_length(end, data)
+        if isinstance(data, memoryview):
+            return end, data[begin:end].tobytes().decode()
+
+        return end, data[begin:end].decode()
+
+    def read_array(self, data: BytesLike, pos: int, size: int) -> Tuple[int, list]:
+        """
+        Read the items of an array, once its header is consumed.
+
+        :param data: The data to read from.
+        :param pos: The position of the first item.
+        :param size: The number of items.
+
+        :return: A tuple with the new position and the array.
+        """
+
+        if size >= _BATCH_MIN_SIZE:
+            ret = self.read_array_batch(data, pos, size)
+            if ret is not None:
+                pos, items = ret
+                run = len(items)
+                if run == size:
+                    return ret
+
+                return self.read_items(data, pos, items + [None] * (size - run), size, run)
+
+        return self.read_items(data, pos, [None] * size, size)
+
+    def read_array_batch(self, data: BytesLike, pos: int, size: int) -> Union[Tuple[int, list], None]:
+        """
+        Read the leading items of an array in a single call, if they are fixints or share the same fixed-width code.
+
+        :param data: The data to read from.
+        :param pos: The position of the first item.
+        :param size: The number of items.
+
+        :return: A tuple with the new position and the items read, which are all the items of the array
+            if it is homogeneous, or None if it does not start with enough homogeneous items.
+        """
+
+        code = data[pos]
+        if code < RECORD[1] + 1 or code >= NEGATIVE_FIXINT[0]:
+            if not self._batch_fixints:
+                return None
+
+            items = bytes(data[pos : pos + size])
+            run = len(items) - len(items.lstrip(_FIXINTS_NO_RECORD if self.records else _FIXINTS))
+            if run < _BATCH_MIN_SIZE:
+                return None
+
+            # fixints are their own signed byte value
+            if run == size and self.typed_arrays:
+                return pos + run, array("b", items)
+
+            return pos + run, memoryview(items)[:run].cast("b").tolist()
+
+        fmt = self._batch_formats.get(code)
+        if fmt is None:
+            return None
+
+        char, width = fmt
+        stride = width + 1
+        codes = bytes(data[pos : pos + size * stride : stride])
+        run = min(len(codes) - len(codes.lstrip(codes[:1])), (len(data) - pos) // stride)
+        if run < _BATCH_MIN_SIZE:
+            return None
+
+        # fixed-size blocks, so the compiled Structs do not depend on the array length
+        end = pos + run * stride
+        values = []
+        block = _batch_struct(char, _BATCH_BLOCK_SIZE)
+        for begin in range(pos, end - block.size + 1, block.size):
+            values += block.unpack_from(data, begin)
+
+        remaining = run % _BATCH_BLOCK_SIZE
+        if remaining:
+            values += _batch_struct(char, remaining).unpack_from(data, end - remaining * stride)
 
-        return end, data[offset:end].decode()
+        if run == size and self.typed_arrays:
+            return end, array(char, values)
 
-    def array(self, data: BytesLike, pos: int, st: Struct, offset: int) -> Tuple[int, list]:
-        end = pos + offset
-        self.check_data_length(end, data)
-        size = st.unpack_from(data, pos)[0]
+        return end, values
 
-        arr = [None] * size
-        for i in range(size):
-            end, arr[i] = self.step(data, end)
+    def array16(self, data: BytesLike, pos: int) -> Tuple[int, list]:
+        end = pos + 2
+        if end > len(data):
+            self.check_data_length(end, data)
 
-        return end, arr
+        return self.read_array(data, end, UINT16_UNPACK(data, pos)[0])
 
-    def map(self, data: BytesLike, pos: int, st: Struct, offset: int) -> Tuple[int, dict]:
-        end = pos + offset
-        self.check_data_length(end, data)
-        size = st.unpack_from(data, pos)[0]
+    def array32(self, data: BytesLike, pos: int) -> Tuple[int, list]:
+        end = pos + 4
+        if end > len(data):
+            self.check_data_length(end, data)
 
-        ret_map = {}
-        for i in range(size):
-            end, key = self.step(data, end)
-            end, value = self.step(data, end)
+        return self.read_array(data, end, UINT32_UNPACK(data, pos)[0])
 
-            ret_map[key] = value
+    def read_map(self, data: BytesLike, pos: int, size: int) -> Tuple[int, dict]:
+        """
+        Read the key/value pairs of a map, once its header is consumed.
+
+        :param data: The data to read from.
+        :param pos: The position of the first key.
+        :param size: The number of key/value pairs.
+
+        :return: A tuple with the new position and the map.
+        """
+
+        return self.read_items(data, pos, {}, size * 2)
 
-        return end, ret_map
+    def read_items(
+        self, data: BytesLike, pos: int, container: Union[list, dict], count: int, index: int = 0
+    ) -> Tuple[int, Any]:
+        """
+        Read the items of an array, or the keys and values of a map, into the given container.
+        Scalars with built-in handlers are decoded inline, and nested arrays and maps are read by the same loop
+        with an explicit stack, so nesting costs no Python call and is not limited by the recursion limit.
+
+        :param data: The data to read from.
+        :param pos: The position of the first item.
+        :param container: The list to fill, or the dict to add the keys and values to.
+        :param count: The number of items, twice the number of pairs for a map.
+        :param index: The number of items already in the list.
+
+        :return: A tuple with the new position and the container.
+        """
+
+        # hoisted out of the loop, global and attribute lookups cost more than locals
+        dispatch = self._dispatch
+        kinds = self._kinds
+        constants = _CONSTANTS
+        key_cache = self._key_cache
+        str_key_cache = self._str_key_cache
+        bundle = self.bundle
+        is_view = isinstance(data, memoryview)
+        length = len(data)
+
+        # parents of the current container, with their count, index and pending key
+        stack = []
+        is_map = type(container) is dict
+        key = None
+
+        while True:
+            if index == count:
+                if not stack:
+                    return pos, container
+
+                value = container
+                container, count, index, is_map, key = stack.pop()
+            else:
+                code = data[pos]
+                kind = kinds[code]
+                if kind == _KIND_CONSTANT:
+                    pos += 1
+                    value = constants[code]
+                elif kind == _KIND_FIXSTR:
+                    begin = pos + 1
+                    pos = begin + (code & 0x1F)
+                    if pos > length:
+                        self.check_data_length(pos, data)
+
+                    if is_map and not index & 1:
+                        # short string key, likely repeated in the following maps
+                        raw = data[begin:pos].tobytes() if is_view else bytes(data[begin:pos])
+                        value = key_cache.get(raw)
+                        if value is None:
+                            value = raw.decode()
+                            # interned strings are never freed on some versions, so only the cached ones are
+                            if len(key_cache) + len(str_key_cache) < _KEY_CACHE_SIZE:
+                                key_cache[raw] = value = intern(value)
+                    elif is_view:
+                        value = data[begin:pos].tobytes().decode()
+                    else:
+                        value = data[begin:pos].decode()
+                elif kind == _KIND_HANDLER:
+                    pos, value = dispatch[code](self, data, pos + 1)
+                    bundle = self.bundle
+
+                    # the value was consumed by the handler (e.g. bundled strings header), the item follows it
+                    if value is SKIP:
+                        continue
+
+                    # other short keys (e.g. str8 or bundled) are shared between maps through their own cache, as
+                    # str and bytes keys would be compared in a single dict (BytesWarning under -b)
+                    if is_map and not index & 1 and type(value) is str and len(value) <= _INTERN_KEY_SIZE:
+                        cached = str_key_cache.get(value)
+                        if cached is not None:
+                            value = cached
+                        elif len(str_key_cache) + (len(key_cache) if key_cache is not None else 0) < _KEY_CACHE_SIZE:
+                            str_key_cache[value] = value = intern(value)
+                else:
+                    pos += 1
+                    if code < ARRAY16:
+                        size = code & 0x0F
+                    elif code == ARRAY16 or code == MAP16:
+                        if pos + 2 > length:
+                            self.check_data_length(pos + 2, data)
+                        size = UINT16_UNPACK(data, pos)[0]
+                        pos += 2
+                    else:
+                        if pos + 4 > length:
+                            self.check_data_length(pos + 4, data)
+                        size = UINT32_UNPACK(data, pos)[0]
+                        pos += 4
+
+                    if kind == _KIND_MAP:
+                        stack.append((container, count, index, is_map, key))
+                        container, count, index, is_map = {}, size * 2, 0, True
+                        continue
+
+                    ret = self.read_array_batch(data, pos, size) if size >= _BATCH_MIN_SIZE else None
+                    if ret is None:
+                        stack.append((container, count, index, is_map, key))
+                        container, count, index, is_map = [None] * size, size, 0, False
+                        continue
+
+                    pos, value = ret
+                    run = len(value)
+                    if run != size:
+                        # only the leading items are homogeneous, read the others in the loop
+                        stack.append((container, count, index, is_map, key))
+                        container, count, index, is_map = value + [None] * (size - run), size, run, False
+                        continue
+
+            if bundle is not None and bundle.begin == pos:
+                pos = bundle.end
+                self.bundle = bundle = None
+
+            if not is_map:
+                container[index] = value
+            elif index & 1:
+                container[key] = value
+            else:
+                key = value
+            index += 1
+
+    def map16(self, data: BytesLike, pos: int) -> Tuple[int, dict]:
+        end = pos + 2
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return self.read_map(data, end, UINT16_UNPACK(data, pos)[0])
+
+    def map32(self, data: BytesLike, pos: int) -> Tuple[int, dict]:
+        end = pos + 4
+        if end > len(data):
+            self.check_data_length(end, data)
+
+        return self.read_map(data, end, UINT32_UNPACK(data, pos)[0])
 
     CODES_FIXED: Dict[int, Callable[["Unpacker", BytesLike, int], Tuple[int, Any]]] = {
         # BUNDLED_STRINGS is handled separately
         NIL: lambda self, data, pos: (pos, None),
         FALSE: lambda self, data, pos: (pos, False),
         TRUE: lambda self, data, pos: (pos, True),
-        BIN8: partial(bin, st=UINT8_STRUCT, offset=UINT8_STRUCT.size),
-        BIN16: partial(bin, st=UINT16_STRUCT, offset=UINT16_STRUCT.size),
-        BIN32: partial(bin, st=UINT32_STRUCT, offset=UINT32_STRUCT.size),
-        EXT8: partial(ext, st=UINT8_STRUCT, offset=UINT8_STRUCT.size),
-        EXT16: partial(ext, st=UINT16_STRUCT, offset=UINT16_STRUCT.size),
-        EXT32: partial(ext, st=UINT32_STRUCT, offset=UINT32_STRUCT.size),
-        FLOAT32: partial(float, st=FLOAT32_STRUCT, size=FLOAT32_STRUCT.size),
-        FLOAT64: partial(float, st=FLOAT64_STRUCT, size=FLOAT64_STRUCT.size),
-        UINT8: partial(int, st=UINT8_STRUCT, size=UINT8_STRUCT.size),
-        UINT16: partial(int, st=UINT16_STRUCT, size=UINT16_STRUCT.size),
-        UINT32: partial(int, st=UINT32_STRUCT, size=UINT32_STRUCT.size),
-        UINT64: partial(int, st=UINT64_STRUCT, size=UINT64_STRUCT.size),
-        INT8: partial(int, st=INT8_STRUCT, size=INT8_STRUCT.size),
-        INT16: partial(int, st=INT16_STRUCT, size=INT16_STRUCT.size),
-        INT32: partial(int, st=INT32_STRUCT, size=INT32_STRUCT.size),
-        INT64: partial(int, st=INT64_STRUCT, size=INT64_STRUCT.size),
-        FIXEXT1: partial(fixext, size=1),
-        FIXEXT2: partial(fixext, size=2),
-        FIXEXT4: partial(fixext, size=4),
-        FIXEXT8: partial(fixext, size=8),
-        FIXEXT16: partial(fixext, size=16),
-        STR8: partial(str, st=UINT8_STRUCT, offset=UINT8_STRUCT.size),
-        STR16: partial(str, st=UINT16_STRUCT, offset=UINT16_STRUCT.size),
-        STR32: partial(str, st=UINT32_STRUCT, offset=UINT32_STRUCT.size),
-        ARRAY16: partial(array, st=UINT16_STRUCT, offset=UINT16_STRUCT.size),
-        ARRAY32: partial(array, st=UINT32_STRUCT, offset=UINT32_STRUCT.size),
-        MAP16: partial(map, st=UINT16_STRUCT, offset=UINT16_STRUCT.size),
-        MAP32: partial(map, st=UINT32_STRUCT, offset=UINT32_STRUCT.size),
+        BIN8: bin8,
+        BIN16: bin16,
+        BIN32: bin32,
+        EXT8: ext8,
+        EXT16: ext16,
+        EXT32: ext32,
+        FLOAT32: float32,
+        FLOAT64: float64,
+        UINT8: uint8,
+        UINT16: uint16,
+        UINT32: uint32,
+        UINT64: uint64,
+        INT8: int8,
+        INT16: int16,
+        INT32: int32,
+        INT64: int64,
+        FIXEXT1: fixext1,
+        FIXEXT2: fixext2,
+        FIXEXT4: fixext4,
+        FIXEXT8: fixext8,
+        FIXEXT16: fixext16,
+        STR8: str8,
+        STR16: str16,
+        STR32: str32,
+        ARRAY16: array16,
+        ARRAY32: array32,
+        MAP16: map16,
+        MAP32: map32,
     }
 
     # Range code points
@@ -197,31 +670,17 @@ class Unpacker:
         return RecordExtension.post_unpack(self, data, pos, identifier1)
 
     def fixmap(self, code: int, data: BytesLike, pos: int) -> Tuple[int, dict]:
-        size = code & 0x0F
-
-        ret_map = {}
-        for i in range(size):
-            pos, key = self.step(data, pos)
-            pos, value = self.step(data, pos)
-
-            ret_map[key] = value
-
-        return pos, ret_map
+        return self.read_map(data, pos, code & 0x0F)
 
     def fixarray(self, code: int, data: BytesLike, pos: int) -> Tuple[int, list]:
-        size = code & 0x0F
-
-        arr = [None] * size
-        for i in range(size):
-            pos, arr[i] = self.step(data, pos)
-
-        return pos, arr
+        return self.read_array(data, pos, code & 0x0F)
 
     def fixstr(self, code: int, data: BytesLike, pos: int) -> Tuple[int, str]:
         size = code & 0x1F
         end = pos + size
 
-        self.check_data_length(end, data)
+        if end > len(data):
+            self.check_data_length(end, data)
         if isinstance(data, memoryview):
             return end, data[pos:end].tobytes().decode()
 
@@ -239,15 +698,28 @@ class Unpacker:
         NEGATIVE_FIXINT: negative_fixint,
     }
 
-    def __init__(self, enable_bundled_strings: bool = True, enable_records: bool = True):
+    def __init__(
+        self,
+        enable_bundled_strings: bool = True,
+        enable_records: bool = True,
+        zero_copy_bin: bool = False,
+        typed_arrays: bool = False,
+    ):
         """
         Initialize the unpacker.
 
         :param enable_bundled_strings: Whether to enable bundled strings.
         :param enable_records: Whether to enable records.
+        :param zero_copy_bin: Whether to return bin payloads as memoryviews into the unpacked data instead of bytes.
+            This avoids a copy per payload, but the data must not be modified while the views are in use,
+            and a bytearray cannot be resized until they are released.
+        :param typed_arrays: Whether to return arrays made only of fixints, or only of numbers of one fixed-width
+            type (e.g. float64 or uint32), as `array.array` instead of list (typecode "b" for fixints, "d" for
+            float64, "I" for uint32...). They are smaller, but do not compare equal to lists.
         """
 
         self.extensions = {}
+        self._ext_handlers = {}
         self.register_extensions(TimestampExtension, UndefinedExtension, RecordExtension, SetExtension)
 
         if enable_bundled_strings:
@@ -255,9 +727,76 @@ class Unpacker:
 
         self.enable_bundled_strings = enable_bundled_strings
         self.records = {} if enable_records else None
+        self.zero_copy_bin = zero_copy_bin
+        self.typed_arrays = typed_arrays
 
         self.bundle = None
 
+        # shared with the class until a code is replaced (see _copy_tables)
+        self._dispatch = self.build_dispatch()
+        self._kinds = self._DISPATCH_KINDS
+        self._batch_formats = self._DISPATCH_BATCH_FORMATS
+        self._batch_fixints = self._DISPATCH_BATCH_FIXINTS
+        # fixstr keys are only cached by the container loop when fixstr is not handled by the class
+        self._key_cache = {} if self._kinds[FIXSTR[0]] == _KIND_FIXSTR else None
+        self._str_key_cache = {}
+
+    @classmethod
+    def build_dispatch(cls) -> Tuple[Callable[["Unpacker", BytesLike, int], Tuple[int, Any]], ...]:
+        """
+        Build the dispatch table of the class, mapping every code byte to its handler.
+        The table is built once per class and cached, as a tuple shared by the instances,
+        along with the kinds of the codes for the container loop (_DISPATCH_KINDS)
+        and the codes that can be batch-decoded (_DISPATCH_BATCH_FORMATS and _DISPATCH_BATCH_FIXINTS).
+
+        :return: The dispatch table, with 256 entries.
+        """
+
+        if "_DISPATCH" in cls.__dict__:
+            return cls._DISPATCH
+
+        dispatch = [_invalid_code] * 256
+        # only the codes still handled by the built-in handlers are decoded inline by the container loop
+        kinds = bytearray(256)
+        for code, func in cls.CODES_FIXED.items():
+            dispatch[code] = func
+            if Unpacker.CODES_FIXED.get(code) is func:
+                kinds[code] = _KINDS[code]
+
+        dispatch[BUNDLED_STRINGS] = cls.bundled_string
+
+        for (low, high), func in cls.CODES_RANGES.items():
+            # built-in handlers get a handler per code, others are wrapped with their code
+            bind = _RANGE_SPECIALIZATIONS.get(func, _bind_range_code)
+            builtin = Unpacker.CODES_RANGES.get((low, high)) is func
+            for code in range(low, high + 1):
+                dispatch[code] = bind(func, code)
+                if builtin:
+                    kinds[code] = _KINDS[code]
+
+        cls._DISPATCH_KINDS = bytes(kinds)
+        # the batch decoding bypasses the handlers as well
+        cls._DISPATCH_BATCH_FORMATS = {
+            code: fmt for code, fmt in _BATCH_FORMATS.items() if cls.CODES_FIXED.get(code) is Unpacker.CODES_FIXED[code]
+        }
+        cls._DISPATCH_BATCH_FIXINTS = all(
+            cls.CODES_RANGES.get(rng) is Unpacker.CODES_RANGES[rng]
+            for rng in (POSITIVE_FIXINT, RECORD, NEGATIVE_FIXINT)
+        )
+        cls._DISPATCH = tuple(dispatch)
+
+        return cls._DISPATCH
+
+    def _copy_tables(self):
+        """
+        Copy the code tables shared with the class, so replacing a code only affects this instance.
+        """
+
+        if type(self._dispatch) is tuple:
+            self._dispatch = list(self._dispatch)
+            self._kinds = bytearray(self._kinds)
+            self._batch_formats = self._batch_formats.copy()
+
     def register_extensions(self, *exts: Type[MsgpackExtension], replace: bool = False):
         """
         Register the given extensions.
@@ -272,6 +811,10 @@ class Unpacker:
                 raise ValueError(f"Extension type {ext_type} is already registered")
 
             self.extensions[ext_type] = ext
+            self._ext_handlers[ext_type] = (
+                ext.unpack,
+                ext.post_unpack if issubclass(ext, MsgpackExtensionWithPost) else None,
+            )
 
     def replace_fixed_code(self, code: int, func: Callable[["Unpacker", BytesLike, int], Tuple[int, Any]]):
         """
@@ -286,7 +829,11 @@ class Unpacker:
         if code not in self.CODES_FIXED:
             raise ValueError(f"Code {code} is not an existing fixed code point")
 
-        self.CODES_FIXED[code] = func
+        self._copy_tables()
+        self._dispatch[code] = func
+        # the batch path and the container loop would bypass the replacement
+        self._batch_formats.pop(code, None)
+        self._kinds[code] = _KIND_HANDLER
 
     def replace_range_code(
         self, low: int, high: int, func: Callable[["Unpacker", int, BytesLike, int], Tuple[int, Any]]
@@ -304,7 +851,16 @@ class Unpacker:
         if (low, high) not in self.CODES_RANGES:
             raise ValueError(f"Code range {low}-{high} is not an existing range code point")
 
-        self.CODES_RANGES[(low, high)] = func
+        self._copy_tables()
+        for code in range(low, high + 1):
+            self._dispatch[code] = _bind_range_code(func, code)
+            self._kinds[code] = _KIND_HANDLER
+
+        if (low, high) in (POSITIVE_FIXINT, RECORD, NEGATIVE_FIXINT):
+            self._batch_fixints = False
+
+        if (low, high) == FIXSTR:
+            self._key_cache = None
 
     def skip_bundle(self, pos: int):
         """
@@ -322,50 +878,50 @@ class Unpacker:
 
         return pos
 
-    def step(self, data: BytesLike, pos: int, restrict: Union[List[int], None] = None):
+    def step(
+        self,
+        data: BytesLike,
+        pos: int,
+        restrict: Union[FrozenSet[int], Sequence[Union[int, Tuple[int, int]]], None] = None,
+    ):
         """
         Extract one item
 
         :param data: The data to extract from.
         :param pos: The current position in the data.
-        :param restrict: The codes to restrict to.
+        :param restrict: The set of the codes to restrict to (see :func:`msgpackr.constants.code_set`).
+            A sequence of codes and (low, high) ranges is also accepted, and converted on each call.
 
         :return: A tuple with the new position and the extracted data.
         """
 
-        code: int = UINT8_STRUCT.unpack_from(data, pos)[0]
+        code: int = data[pos]
         pos += 1
 
-        if restrict is not None and not any(
-            isinstance(r, int) and r == code or isinstance(r, tuple) and r[0] <= code <= r[1] for r in restrict
-        ):
-            restrict_str = ", ".join(f"{r[0]:02x}-{r[1]:02x}" if isinstance(r, tuple) else f"{r:02x}" for r in restrict)
+        if restrict is not None:
+            if type(restrict) is not frozenset:
+                restrict = code_set(*restrict)
 
-            raise ValueError(f"Invalid code: {hex(code)} at position {hex(pos)} (expected {restrict_str})")
+            if code not in restrict:
+                raise ValueError(
+                    f"Invalid code: {hex(code)} at position {hex(pos)} (expected {_format_codes(restrict)})"
+                )
 
-        # fixed code points
-        if code in self.CODES_FIXED:
-            pos, ret = self.CODES_FIXED[code](self, data, pos)
+        # fixints and nil/true/false are the most common items, and need no handler
+        if self._kinds[code] == _KIND_CONSTANT:
+            ret = _CONSTANTS[code]
+        else:
+            pos, ret = self._dispatch[code](self, data, pos)
 
-            if ret is SKIP:
-                pos, ret = self.step(data, pos)
-            pos = self.skip_bundle(pos)
+            # the value was consumed by the handler (e.g. bundled strings header), the item follows it
+            while ret is SKIP:
+                pos, ret = self._dispatch[data[pos]](self, data, pos + 1)
 
-            return pos, ret
-
-        # special case for bundled strings
-        if code == BUNDLED_STRINGS:
-            return self.bundled_string(data, pos)
-
-        # range code points
-        for (low, high), func in self.CODES_RANGES.items():
-            if low <= code <= high:
-                pos, ret = func(self, code, data, pos)
-                pos = self.skip_bundle(pos)
-
-                return pos, ret
+        # no call in the common case where no bundle is live
+        if self.bundle is not None:
+            pos = self.skip_bundle(pos)
 
-        raise ValueError(f"Invalid code: 0x{code:02x} at position {hex(pos)}")
+        return pos, ret
 
     def unpack(self, data: BytesLike, multiple: bool = False, allow_remaining: bool = False):
         """
@@ -379,22 +935,33 @@ class Unpacker:
         """
 
         pos = 0
-        data = memoryview(data)
+        # strings decode fastest from bytes slices: small buffers are copied once, larger ones are read through a view
+        if isinstance(data, bytes):
+            view = None
+        elif len(data) <= _COPY_MAX_SIZE and not self.zero_copy_bin:
+            data, view = bytes(data), None
+        else:
+            data = view = memoryview(data)
         length = len(data)
 
-        ret_data = []
-        while pos < length:
-            pos, ret = self.step(data, pos)
+        # release the view once done, so a bytearray can be resized again (zero-copy bin slices keep their own export)
+        try:
+            ret_data = []
+            while pos < length:
+                pos, ret = self.step(data, pos)
 
-            if not multiple:
-                if not allow_remaining and pos < length:
-                    raise ValueError(f"Remaining data after unpacking: {length - pos} bytes")
+                if not multiple:
+                    if not allow_remaining and pos < length:
+                        raise ValueError(f"Remaining data after unpacking: {length - pos} bytes")
 
-                return ret
+                    return ret
 
-            ret_data.append(ret)
+                ret_data.append(ret)
 
-        return ret_data
+            return ret_data
+        finally:
+            if view is not None:
+                view.release()
 
     def export_state(self) -> dict:
         """
@@ -421,3 +988,53 @@ class Unpacker:
         bundle = state["bundle"]
         self.bundle = bundle.copy() if bundle is not None and copy else bundle
         self.records = state["records"].copy() if copy else state["records"]
+
+
+def _positive_fixint_handler(_func, code: int):
+    return lambda _self, _data, pos: (pos, code)
+
+
+def _negative_fixint_handler(_func, code: int):
+    value = code - 0x100
+
+    return lambda _self, _data, pos: (pos, value)
+
+
+def _fixstr_handler(_func, code: int):
+    size = code & 0x1F
+    if not size:
+        return lambda _self, _data, pos: (pos, "")
+
+    def fixstr(self: Unpacker, data: BytesLike, pos: int) -> Tuple[int, str]:
+        end = pos + size
+
+        if end > len(data):
+            self.check_data_length(end, data)
+        if isinstance(data, memoryview):
+            return end, data[pos:end].tobytes().decode()
+
+        return end, data[pos:end].decode()
+
+    return fixstr
+
+
+def _fixarray_handler(_func, code: int):
+    size = code & 0x0F
+
+    return lambda self, data, pos: self.read_array(data, pos, size)
+
+
+def _fixmap_handler(_func, code: int):
+    size = code & 0x0F
+
+    return lambda self, data, pos: self.read_map(data, pos, size)
+
+
+#: Builders of per-code handlers for the built-in range handlers, with the value or size of the code baked in.
+_RANGE_SPECIALIZATIONS = {
+    Unpacker.positive_fixint: _positive_fixint_handler,
+    Unpacker.negative_fixint: _negative_fixint_handler,
+    Unpacker.fixstr: _fixstr_handler,
+    Unpacker.fixarray: _fixarray_handler,
+    Unpacker.fixmap: _fixmap_handler,
+}
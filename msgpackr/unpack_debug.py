@@ -1,4 +1,3 @@
-from functools import partial
 from logging import Logger
 from typing import Union
 
@@ -36,20 +35,22 @@ def attach_logger(
             else:
                 logger.info(msg)
 
-        def get_code_name(code: int) -> str:
-            if code in inner_cls.CODES_FIXED:
-                return inner_cls.NAMES[code] + f" (0x{code:02x})"
+        # names of every code byte, computed once instead of searching the ranges on each step
+        code_names = [f"<{code:02x}>" for code in range(256)]
+        for low, high in inner_cls.CODES_RANGES:
+            for code in range(low, high + 1):
+                code_names[code] = inner_cls.NAMES_RANGE[(low, high)] + f" (0x{code:02x})"
 
-            for (low, high), func in inner_cls.CODES_RANGES.items():
-                if low <= code <= high:
-                    return inner_cls.NAMES_RANGE[(low, high)] + f" (0x{code:02x})"
+        for code in inner_cls.CODES_FIXED:
+            code_names[code] = inner_cls.NAMES[code] + f" (0x{code:02x})"
 
-            return f"<{code:02x}>"
+        def get_code_name(code: int) -> str:
+            return code_names[code]
 
         step_func = inner_cls.step
 
         def step_wrapper(self, data, pos, *args, **kwargs):
-            code = UINT8_STRUCT.unpack_from(data, pos)[0]
+            code = data[pos]
 
             msg = ""
             if log_pos:
@@ -83,18 +84,21 @@ def attach_logger(
     return inner if cls is None else inner(cls)
 
 
-def array(self, data: BytesLike, pos: int, st: Struct, offset: int):
-    end = pos + offset
-    self.check_data_length(end, data)
-    size = st.unpack_from(data, pos)[0]
+def make_array(st: Struct):
+    def array(self, data: BytesLike, pos: int):
+        end = pos + st.size
+        self.check_data_length(end, data)
+        size = st.unpack_from(data, pos)[0]
 
-    arr = [None] * size
-    for i in range(size):
-        end, arr[i] = self.step(data, end)
+        arr = [None] * size
+        for i in range(size):
+            end, arr[i] = self.step(data, end)
 
-        print(f"   => {i+1}/{size}: {arr[i]}")
+            print(f"   => {i+1}/{size}: {arr[i]}")
+
+        return end, arr
 
-    return end, arr
+    return array
 
 
 def fixarray(self, code: int, data: BytesLike, pos: int):
@@ -124,21 +128,24 @@ def fixmap(self, code: int, data: BytesLike, pos: int):
     return pos, ret_map
 
 
-def map_func(self, data: BytesLike, pos: int, st: Struct, offset: int):
-    end = pos + offset
-    self.check_data_length(end, data)
-    size = st.unpack_from(data, pos)[0]
+def make_map(st: Struct):
+    def map_func(self, data: BytesLike, pos: int):
+        end = pos + st.size
+        self.check_data_length(end, data)
+        size = st.unpack_from(data, pos)[0]
 
-    ret_map = {}
-    for i in range(size):
-        end, key = self.step(data, end)
-        end, value = self.step(data, end)
+        ret_map = {}
+        for i in range(size):
+            end, key = self.step(data, end)
+            end, value = self.step(data, end)
 
-        print(f"   => {key} ({i+1}/{size}): {value}")
+            print(f"   => {key} ({i+1}/{size}): {value}")
 
-        ret_map[key] = value
+            ret_map[key] = value
+
+        return end, ret_map
 
-    return end, ret_map
+    return map_func
 
 
 @attach_logger(log_pos=True, log_func=True, log_ext=True, log_bundle=True, log_return=True)
@@ -187,20 +194,28 @@ class Unpacker(UnpackerBase):
         NEGATIVE_FIXINT: "neg fixint",
     }
 
-    def __init__(self, enable_bundled_strings: bool = True, enable_records: bool = True):
+    def __init__(
+        self,
+        enable_bundled_strings: bool = True,
+        enable_records: bool = True,
+        zero_copy_bin: bool = False,
+        typed_arrays: bool = False,
+    ):
         """
         Initialize the unpacker.
 
         :param enable_bundled_strings: Whether to enable bundled strings.
         :param enable_records: Whether to enable records.
+        :param zero_copy_bin: Whether to return bin payloads as memoryviews into the unpacked data instead of bytes.
+        :param typed_arrays: Whether to return arrays made only of fixints or fixed-width numbers as `array.array`.
         """
 
-        super().__init__(enable_bundled_strings, enable_records)
+        super().__init__(enable_bundled_strings, enable_records, zero_copy_bin, typed_arrays)
 
-        self.replace_fixed_code(ARRAY16, partial(array, st=UINT16_STRUCT, offset=UINT16_STRUCT.size))
-        self.replace_fixed_code(ARRAY32, partial(array, st=UINT32_STRUCT, offset=UINT32_STRUCT.size))
-        self.replace_fixed_code(MAP16, partial(map_func, st=UINT16_STRUCT, offset=UINT16_STRUCT.size))
-        self.replace_fixed_code(MAP32, partial(map_func, st=UINT32_STRUCT, offset=UINT32_STRUCT.size))
+        self.replace_fixed_code(ARRAY16, make_array(UINT16_STRUCT))
+        self.replace_fixed_code(ARRAY32, make_array(UINT32_STRUCT))
+        self.replace_fixed_code(MAP16, make_map(UINT16_STRUCT))
+        self.replace_fixed_code(MAP32, make_map(UINT32_STRUCT))
 
         self.replace_range_code(FIXARRAY[0], FIXARRAY[1], fixarray)  # type: ignore
         self.replace_range_code(FIXMAP[0], FIXMAP[1], fixmap)  # type: ignore
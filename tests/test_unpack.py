@@ -0,0 +1,317 @@
+import os
+import struct
+import subprocess
+import sys
+from array import array
+from base64 import b64decode
+from pathlib import Path
+
+import pytest
+
+from msgpackr.constants import ARRAY16, FIXARRAY, FIXSTR, INT, NIL, POSITIVE_FIXINT, STR, UINT16
+from msgpackr.extension import BigIntExtension, RecordExtension
+from msgpackr.unpack import Unpacker as BaseUnpacker
+
+if os.environ.get("DEBUG"):
+    from msgpackr.unpack_debug import Unpacker
+else:
+    from msgpackr.unpack import Unpacker
+
+
+@pytest.mark.parametrize("data_type", [bytes, bytearray, memoryview])
+def test_str_data_types(data_type):
+    unpacker = Unpacker()
+    data = data_type(b"\x00\xd9\x05hello\xa5world")
+
+    assert unpacker.step(data, 1) == (8, "hello")
+    assert unpacker.step(data, 8) == (14, "world")
+
+
+@pytest.mark.parametrize(
+    "fmt, values",
+    [
+        (b"\xcb>d", [0.5 * i for i in range(20)]),
+        (b"\xcb>d", [0.25 * i for i in range(150)]),
+        (b"\xd2>i", [-70000, -1, 0, 1, 70000]),
+        (b"\xcd>H", [0, 1, 0xFFFF, 0x1234]),
+    ],
+)
+def test_homogeneous_array(fmt, values):
+    code, st = fmt[:1], fmt[1:].decode()
+    data = b"\xdc" + len(values).to_bytes(2, "big") + b"".join(code + struct.pack(st, v) for v in values)
+
+    assert Unpacker().unpack(data) == values
+
+    # break the homogeneity on the last item
+    data = data[: -struct.calcsize(st) - 1] + b"\x05"
+
+    assert Unpacker().unpack(data) == values[:-1] + [5]
+
+
+def test_fixint_array():
+    values = list(range(-32, 128))
+    data = b"\xdc" + len(values).to_bytes(2, "big") + bytes(v & 0xFF for v in values)
+
+    assert Unpacker().unpack(data) == values
+
+
+def test_fixint_run():
+    # leading fixints followed by other items, at the top level and nested
+    data = b"\x92\x97\x01\x02\x40\xff\xe0\xa1a\x03\x96\x01\x02\x03\x04\x05\xc0"
+
+    assert Unpacker().unpack(data) == [[1, 2, 64, -1, -32, "a", 3], [1, 2, 3, 4, 5, None]]
+    assert BaseUnpacker(typed_arrays=True).unpack(data[1:10]) == [1, 2, 64, -1, -32, "a", 3]
+
+
+def test_fixint_array_with_records():
+    unpacker = Unpacker()
+    unpacker.records[0] = ["a"]
+
+    # 0x40 refers to the record 0 once records are defined
+    assert unpacker.unpack(b"\x94\x40\x01\x02\x03\x04") == [{"a": 1}, 2, 3, 4]
+
+
+def test_restrict():
+    unpacker = Unpacker()
+
+    assert unpacker.step(b"\xd0\xff", 0, restrict=INT) == (2, -1)
+    assert unpacker.step(b"\xa1a", 0, restrict=STR) == (2, "a")
+
+    with pytest.raises(ValueError, match=r"expected a0-bf, d9-db"):
+        unpacker.step(b"\x01", 0, restrict=STR)
+
+    # sequences of codes and ranges are still accepted
+    assert unpacker.step(b"\x91\x01", 0, restrict=(FIXARRAY, ARRAY16)) == (2, [1])
+
+    with pytest.raises(ValueError, match=r"expected 90-9f, dc"):
+        unpacker.step(b"\x01", 0, restrict=[FIXARRAY, ARRAY16])
+
+
+@pytest.mark.parametrize("data, identifier", [(b"\x41", 0x01), (b"\x7f", 0x3F), (b"\x41\x02", (0x02 << 5) + 0x01)])
+def test_record_identifier(data, identifier):
+    assert RecordExtension.unpack(Unpacker(), data, 0, len(data)) == identifier
+
+
+def test_bin():
+    data = b"\xc4\x03abc"
+
+    ret = Unpacker().unpack(data)
+    assert isinstance(ret, bytes) and ret == b"abc"
+
+    ret = Unpacker(zero_copy_bin=True).unpack(data)
+    assert isinstance(ret, memoryview) and ret == b"abc"
+
+    # views refer to the given buffer, which is not copied
+    buffer = bytearray(data)
+    ret = Unpacker(zero_copy_bin=True).unpack(buffer)
+    assert ret.obj is buffer
+
+    with pytest.raises(ValueError, match="Data is too short"):
+        Unpacker().unpack(data[:-1])
+
+
+def test_map_key_cache(monkeypatch):
+    long_key = "k" * 40
+    item = b"\x83\xa3key\x01\xd9\x28" + long_key.encode() + b"\x02\x03\x04"
+    ret = Unpacker().unpack(b"\x92" + item + item)
+
+    assert ret == [{"key": 1, long_key: 2, 3: 4}] * 2
+
+    # short keys are shared between maps (the debug unpacker replaces the map functions)
+    ret = BaseUnpacker().unpack(b"\x92" + item + item)
+    assert next(iter(ret[0])) is next(iter(ret[1]))
+
+    # str8 keys too, up to 32 characters
+    item = b"\x82\xd9\x20" + b"s" * 32 + b"\x01\xd9\x28" + long_key.encode() + b"\x02"
+    ret = BaseUnpacker().unpack(b"\x92" + item + item)
+    first, second = (list(m) for m in ret)
+    assert first[0] is second[0] and first[1] is not second[1]
+
+    # keys past the cache size are neither cached nor interned
+    unpacker = BaseUnpacker()
+    monkeypatch.setattr("msgpackr.unpack._KEY_CACHE_SIZE", 0)
+    ret = unpacker.unpack(b"\x92\x81\xa3new\x01\x81\xa3new\x02")
+    assert next(iter(ret[0])) is not next(iter(ret[1])) and unpacker._key_cache == {}
+
+    item = b"\x81\xd9\x20" + b"s" * 32 + b"\x01"
+    ret = unpacker.unpack(b"\x92" + item + item)
+    assert next(iter(ret[0])) is not next(iter(ret[1])) and unpacker._str_key_cache == {}
+
+
+def test_map_key_cache_bytes_warning():
+    # fixstr keys are cached by raw bytes, and must never be compared with the str8 keys cached by value
+    code = """if True:
+        import warnings
+        from msgpackr.unpack import Unpacker
+
+        warnings.simplefilter("error", BytesWarning)
+        item = b"\\x82\\xa3key\\x01\\xd9\\x03key\\x02"
+        assert Unpacker().unpack(b"\\x92" + item + item) == [{"key": 2}] * 2
+    """
+    root = Path(__file__).parent.parent
+    subprocess.run([sys.executable, "-b", "-c", code], cwd=root, check=True)
+
+
+@pytest.mark.parametrize("file", sorted((Path(__file__).parent / "resources").glob("*.b64")))
+def test_no_output(file, capsys):
+    BaseUnpacker().unpack(b64decode(file.read_text("utf-8")))
+
+    # tracing belongs to msgpackr.unpack_debug, the regular unpacker must stay silent
+    assert capsys.readouterr() == ("", "")
+
+
+def test_typed_fixint_array():
+    values = list(range(-32, 128))
+    data = b"\xdc" + len(values).to_bytes(2, "big") + bytes(v & 0xFF for v in values)
+    ret = BaseUnpacker(typed_arrays=True).unpack(data)
+
+    assert ret == array("b", values)
+
+
+@pytest.mark.parametrize("fmt, typecode", [(b"\xcb>d", "d"), (b"\xce>I", "I"), (b"\xd1>h", "h")])
+def test_typed_number_array(fmt, typecode):
+    code, st = fmt[:1], fmt[1:].decode()
+    values = [0, 1, 2, 300, 4000]
+    data = b"\x95" + b"".join(code + struct.pack(st, v) for v in values)
+    ret = BaseUnpacker(typed_arrays=True).unpack(data)
+
+    assert ret == array(typecode, values)
+
+    # arrays that are not homogeneous stay lists
+    assert BaseUnpacker(typed_arrays=True).unpack(b"\x96" + data[1:] + b"\xc0") == values + [None]
+
+
+@pytest.mark.parametrize("header", [b"\xc7\x05", b"\xc8\x00\x05", b"\xc9\x00\x00\x00\x05"])
+def test_ext(header):
+    # BigIntExtension (66) is not registered by default
+    unpacker = Unpacker()
+    unpacker.register_extensions(BigIntExtension)
+
+    assert unpacker.unpack(header + b"\x42" + (2**39 + 1).to_bytes(5, "big")) == 2**39 + 1
+
+    with pytest.raises(ValueError, match="Unknown extension type: -2"):
+        unpacker.unpack(header + b"\xfe" + bytes(5))
+
+
+def test_release(monkeypatch):
+    data = bytearray(b"\x93\xa3abc\xc4\x03xyz\xc0")
+    views = []
+
+    def nil(_self, view, pos):
+        views.append(view)
+        return pos, None
+
+    # zero-copy bin views are sliced from a view of the buffer itself, which is released once done
+    unpacker = BaseUnpacker(zero_copy_bin=True)
+    unpacker.replace_fixed_code(0xC0, nil)
+    ret = unpacker.unpack(data)
+    assert ret == ["abc", b"xyz", None] and bytes(ret[1]) == b"xyz"
+    with pytest.raises(ValueError, match="released"):
+        views.pop()[0]
+
+    # only the returned view holds an export on the buffer
+    with pytest.raises(BufferError):
+        data.extend(b"\xc0")
+    ret[1].release()
+    data.extend(b"\xc0")
+
+    # buffers too large to be copied are read through a view too
+    monkeypatch.setattr("msgpackr.unpack._COPY_MAX_SIZE", 0)
+    unpacker = BaseUnpacker()
+    unpacker.replace_fixed_code(0xC0, nil)
+    assert unpacker.unpack(data, multiple=True) == [["abc", b"xyz", None], None]
+    with pytest.raises(ValueError, match="released"):
+        views.pop()[0]
+    data.extend(b"\xc0")
+
+
+@pytest.mark.parametrize("decoders", [True, False])
+def test_records(decoders, monkeypatch):
+    if not decoders:
+        # past the number of generated decoders, records are decoded with a loop
+        monkeypatch.setattr("msgpackr.extension._RECORD_DECODERS_KEYS", 0)
+        monkeypatch.setattr("msgpackr.extension._RECORD_DECODERS", {})
+
+    # record 0 defined with keys ["a", "b"] (ext 0x72), then reused by its identifier
+    definition = b"\xd4\x72\x40\x92\xa1a\xa1b\x01\x02"
+    unpacker = Unpacker()
+
+    assert unpacker.unpack(b"\x93" + definition + b"\x40\x03\xa1c\x40\x92\x05\x06\xc0") == [
+        {"a": 1, "b": 2},
+        {"a": 3, "b": "c"},
+        {"a": [5, 6], "b": None},
+    ]
+    assert unpacker.records == {0: ("a", "b")}
+
+
+def test_deep_nesting():
+    depth = 10000
+    data = b"\x91\x81\xa1k" * depth + b"\xc0"
+
+    # nested containers do not recurse (the debug unpacker replaces the container functions)
+    ret = BaseUnpacker().unpack(data)
+    for _ in range(depth):
+        ret = ret[0]["k"]
+    assert ret is None
+
+    assert Unpacker().unpack(b"\x93\x92\x01\xdc\x00\x01\xa1a\xde\x00\x01\x02\x90\x80") == [[1, ["a"]], {2: []}, {}]
+
+
+def test_replace_code():
+    unpacker = BaseUnpacker()
+    unpacker.replace_fixed_code(0xC0, lambda _self, _data, pos: (pos, "nil"))
+    unpacker.replace_range_code(0xA0, 0xBF, lambda _self, code, _data, pos: (pos + (code & 0x1F), "str"))
+
+    assert unpacker.unpack(b"\x93\xc0\xa1a\x01") == ["nil", "str", 1]
+
+    # the tables are shared by the other instances until a code is replaced
+    assert BaseUnpacker().unpack(b"\x93\xc0\xa1a\x01") == [None, "a", 1]
+
+
+class SubUnpacker(BaseUnpacker):
+    CODES_FIXED = {**BaseUnpacker.CODES_FIXED, NIL: lambda _self, _data, pos: (pos, "NIL")}
+    CODES_RANGES = {**BaseUnpacker.CODES_RANGES, FIXSTR: lambda _self, code, _data, pos: (pos + (code & 0x1F), "S")}
+
+
+def test_subclass_codes():
+    # codes replaced by a subclass are not decoded inline by the container loop
+    unpacker = SubUnpacker()
+
+    assert unpacker.unpack(b"\x92\xc0\xa1a") == ["NIL", "S"]
+    assert unpacker.unpack(b"\x81\xa1k\xc0") == {"S": "NIL"} and unpacker._key_cache is None
+    assert BaseUnpacker().unpack(b"\x92\xc0\xa1a") == [None, "a"]
+
+    # nor by the constant shortcut of step
+    assert unpacker.unpack(b"\xc0") == "NIL"
+    assert unpacker.step(b"\x00\xc0", 1) == (2, "NIL")
+
+
+def test_subclass_batch_codes():
+    class BatchSubUnpacker(BaseUnpacker):
+        CODES_FIXED = {**BaseUnpacker.CODES_FIXED, UINT16: lambda _self, _data, pos: (pos + 2, "U16")}
+        CODES_RANGES = {**BaseUnpacker.CODES_RANGES, POSITIVE_FIXINT: lambda _self, code, _data, pos: (pos, -code)}
+
+    # codes replaced by a subclass are not batch-decoded
+    unpacker = BatchSubUnpacker(typed_arrays=True)
+
+    assert unpacker.unpack(b"\x94" + b"\xcd\x00\x01" * 4) == ["U16"] * 4
+    assert unpacker.unpack(b"\x94\x01\x02\x03\x04") == [-1, -2, -3, -4]
+    assert unpacker.unpack(b"\x94" + b"\xce\x00\x00\x00\x01" * 4) == array("L", [1] * 4)
+
+
+def test_record_decoders(monkeypatch):
+    decoders = {}
+    monkeypatch.setattr("msgpackr.extension._RECORD_DECODERS", decoders)
+    monkeypatch.setattr("msgpackr.extension._record_decoders_keys", 0)
+
+    # a decoder is only generated once a record is reused, and only for small records
+    keys = [f"k{i}" for i in range(65)]
+    small = b"\xd4\x72\x40\x92\xa1a\xa1b\x01\x02"
+    large = b"\xd4\x72\x41\xdc\x00\x41" + b"".join(bytes([0xA0 | len(k)]) + k.encode() for k in keys) + b"\x00" * 65
+    unpacker = Unpacker()
+
+    assert unpacker.unpack(b"\x92" + small + large) == [{"a": 1, "b": 2}, dict.fromkeys(keys, 0)]
+    assert decoders == {}
+
+    assert unpacker.unpack(b"\x92\x40\x03\x04\x41" + b"\x00" * 65) == [{"a": 3, "b": 4}, dict.fromkeys(keys, 0)]
+    assert list(decoders) == [("a", "b")]